@@ -4,7 +4,7 @@ import os
 from datetime import datetime
 from typing import List, Iterable, Dict, Any, Optional
 import json
-import uuid
+import secrets
 
 from models.types import BaseType
 
@@ -16,11 +16,23 @@ class Base:
 
     _storage = {}
 
+    def __init_subclass__(cls, **kwargs: Any) -> None:
+        """ Give every subclass its own storage once, at class creation """
+        super().__init_subclass__(**kwargs)
+        cls._storage = {}
+
     def __init__(self, *args: List[Any], **kwargs: Dict[str, Any]):
         """ Initialize a Base instance """
-        self.id = kwargs.get('id', str(uuid.uuid4()))
-        self.created_at = kwargs.get('created_at', datetime.utcnow())
-        self.updated_at = kwargs.get('updated_at', datetime.utcnow())
+        self.id = kwargs.get('id') or secrets.token_hex(16)
+        self.created_at = kwargs.get('created_at')
+        self.updated_at = kwargs.get('updated_at')
+
+        if self.created_at is None or self.updated_at is None:
+            now = datetime.utcnow()
+            if self.created_at is None:
+                self.created_at = now
+            if self.updated_at is None:
+                self.updated_at = now
 
         if isinstance(self.created_at, str):
             self.created_at = datetime.strptime(
@@ -29,9 +41,6 @@ class Base:
             self.updated_at = datetime.strptime(
                 self.updated_at, TIMESTAMP_FORMAT)
 
-        # Ensure class-level storage exists
-        self.__class__.init_storage()
-
     def __eq__(self, other: BaseType) -> bool:
         """ Check equality based on ID """
         return isinstance(other, Base) and self.id == other.id
@@ -50,6 +59,15 @@ class Base:
 
         return result
 
+    @classmethod
+    def _get_file_path(cls) -> str:
+        """ Return the file path for storing objects, computed once """
+        file_path = cls.__dict__.get('_file_path')
+        if file_path is None:
+            file_path = f".db_{cls.__name__}.json"
+            cls._file_path = file_path
+        return file_path
+
     @classmethod
     def init_storage(cls) -> None:
         """ Initialize storage for the class if not already initialized """
@@ -59,7 +77,7 @@ class Base:
     @classmethod
     def load_from_file(cls) -> None:
         """ Load objects from file into storage """
-        file_path = f".db_{cls.__name__}.json"
+        file_path = cls._get_file_path()
         if not os.path.exists(file_path):
             return
 
@@ -71,14 +89,19 @@ class Base:
     @classmethod
     def save_to_file(cls) -> None:
         """ Save all objects to file """
-        file_path = f".db_{cls.__name__}.json"
+        file_path = cls._get_file_path()
         objs_json = {
             obj_id: obj.to_json(True) for
             obj_id, obj in cls._storage.items()
         }
 
-        with open(file_path, 'w') as f:
+        # Write to a temporary file and atomically swap it in place
+        tmp_path = f"{file_path}.tmp"
+        with open(tmp_path, 'w') as f:
             json.dump(objs_json, f)
+            f.flush()
+            os.fsync(f.fileno())
+        os.replace(tmp_path, file_path)
 
     def save(self) -> None:
         """ Save current object to storage """
@@ -3,6 +3,7 @@
 User module
 """
 import hashlib
+import hmac
 from typing import List, Dict, Any, Optional
 
 from models.base import Base
@@ -37,7 +38,7 @@ class User(Base):
         """ Validate a password """
         if not isinstance(pwd, str) or not pwd or not self.password:
             return False
-        return self._encrypt_password(pwd) == self.password
+        return hmac.compare_digest(self._encrypt_password(pwd), self.password)
 
     def display_name(self) -> str:
         """ Display the full name based on email, first name, and last name """
@@ -52,4 +53,4 @@ class User(Base):
     @staticmethod
     def _encrypt_password(pwd: str) -> str:
         """ Encrypt the password using SHA256 """
-        return hashlib.sha256(pwd.encode()).hexdigest().lower()
+        return hashlib.sha256(pwd.encode('utf-8')).hexdigest()
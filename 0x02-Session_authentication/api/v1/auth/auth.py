@@ -38,7 +38,7 @@ import flask
 
 from models.types import UserType
 from config import config
-from utils import override
+from utils import override, enforce_overrides
 
 
 class AuthInterface(ABC):
@@ -130,6 +130,11 @@ class Auth(AuthInterface):
       must be implemented in subclasses.
     """
 
+    def __init_subclass__(cls, **kwargs) -> None:
+        """Check once per subclass that `@override` methods are overridden."""
+        super().__init_subclass__(**kwargs)
+        enforce_overrides(cls)
+
     @override
     def current_user(
             self, _request: flask.Request = None
@@ -135,7 +135,9 @@ class BasicAuth(Auth):
         if not isinstance(user_email, str) or not isinstance(user_pwd, str):
             return None
 
-        user = User.search({"email": user_email}).first()
+        user = User.search(
+            {"email": User.normalize_email(user_email)}
+        ).first()
         if not user:
             return None
 
@@ -12,11 +12,11 @@ Classes:
 to determine the duration of session validity.
 Sessions are stored in an instance of `ExpiringDict`,
 which tracks the expiration time of each session and deletes
-expired sessions when they are accessed.
-It overrides the `create_session`, `user_id_for_session_id`,
-and other session management methods from `SessionAuth`.
+expired sessions when they are accessed. The user ID is stored
+directly as the value, since `ExpiringDict` already keeps the
+deadline of every entry.
+It overrides the `user_id_for_session_id` method from `SessionAuth`.
 """
-from datetime import datetime
 from typing import Optional
 
 from api.v1.auth.session_auth import SessionAuth
@@ -42,26 +42,6 @@ class SessionExpAuth(SessionAuth):
         self.session_duration = config.SESSION_DURATION
         self.user_id_by_session_id = ExpiringDict(self.session_duration)
 
-    def create_session(self, user_id: str = None) -> Optional[str]:
-        """
-        Create a session ID with an expiration time.
-
-        Args:
-            user_id (str): The user ID for whom the session is being created.
-
-        Returns:
-            str: The session ID created, or None if it can't be created.
-        """
-        session_id = super().create_session(user_id)
-        if not session_id:
-            return None
-
-        # Add session to the dictionary with expiration
-        self.user_id_by_session_id[session_id] = \
-            {'user_id': user_id, "created_at": datetime.now()}
-
-        return session_id
-
     def user_id_for_session_id(self, session_id: str = None) -> Optional[str]:
         """
         Retrieve user ID for the given session ID, considering expiration.
@@ -76,12 +56,4 @@ class SessionExpAuth(SessionAuth):
         if session_id is None:
             return None
 
-        session = self.user_id_by_session_id[session_id]
-        if not session:
-            return None
-
-        if not session.get("created_at"):
-            self.user_id_by_session_id.expire_key(session_id)
-            return None
-
-        return session.get('user_id')
+        return self.user_id_by_session_id[session_id]
@@ -72,7 +72,7 @@ def session_login() -> str:
         return make_response(jsonify({"error": "password missing"}), 400)
 
     # Retrieve the User instance based on the email
-    users = User.search({"email": email})
+    users = User.search({"email": User.normalize_email(email)})
     user: User = users.first()
 
     if not user:
@@ -2,7 +2,10 @@
 """
 Module of Users views API
 """
-from flask import abort, jsonify, request, make_response
+import json
+from typing import Iterator
+
+from flask import abort, jsonify, request, make_response, Response
 from api.v1.views import app_views
 from models.user import User
 
@@ -11,10 +14,21 @@ from models.user import User
 def view_all_users() -> str:
     """ GET /api/v1/users
     Return:
-      - list of all User objects JSON represented
+      - list of all User objects JSON represented, streamed one user
+        at a time instead of building the whole payload in memory
     """
-    all_users = [user.to_json() for user in User.all()]
-    return make_response(jsonify(all_users), 200)
+    # Snapshot the users so concurrent writes don't break the iteration
+    all_users = User.all()
+
+    def generate() -> Iterator[str]:
+        yield '['
+        for index, user in enumerate(all_users):
+            if index:
+                yield ','
+            yield json.dumps(user.to_json())
+        yield ']\n'
+
+    return Response(generate(), status=200, mimetype='application/json')
 
 
 @app_views.route('/users/<user_id>', methods=['GET'], strict_slashes=False)
@@ -27,9 +27,11 @@ Constants:
 import os
 import io
 import json
-import uuid
+import secrets
 from datetime import datetime
-from typing import List, Dict, Any, Optional, cast, Generator
+from typing import (
+    List, Dict, Any, Optional, cast, Generator, Iterable, Tuple
+)
 
 from models.types import BaseType
 
@@ -77,12 +79,22 @@ class Query:
         if not self.attributes:
             # If no attributes, return all objects lazily
             yield from self.model.get_all_objects()
+            return
+
+        # Narrow the candidates through the indexes when possible,
+        # otherwise fall back to scanning every stored object
+        candidate_ids = self.model.lookup_index(self.attributes)
+        if candidate_ids is None:
+            candidates = self.model.get_all_objects()
         else:
-            # Otherwise, filter objects lazily based on attributes
-            for obj in self.model.get_all_objects():
-                if all(getattr(obj, k, None) == v
-                       for k, v in self.attributes.items()):
-                    yield obj
+            candidates = self.model.get_many(candidate_ids)
+
+        # Still check every attribute, as unhashable values and attributes
+        # that are not indexed are not narrowed down by the indexes
+        for obj in candidates:
+            if obj is not None and all(getattr(obj, k, None) == v
+                                       for k, v in self.attributes.items()):
+                yield obj
 
     def _get_results(self) -> List[BaseType]:
         """Filter the results and cache them for reuse."""
@@ -125,6 +137,10 @@ class Base:
             in memory.
         _file_prefix (str): The prefix used for the file name where objects are
                              stored.
+        _indexed_attributes (tuple): Names of the attributes to keep a hash
+                                     index for, set by subclasses.
+        _indexes (dict): Maps each indexed attribute to a dictionary of
+                         value -> IDs of the objects holding that value.
         id (str): The unique identifier of the object.
         created_at (datetime): The timestamp of when the object was created.
         updated_at (datetime): The timestamp of the last update to the object.
@@ -132,6 +148,16 @@ class Base:
 
     _storage: Dict[str, 'Base'] = {}
     _file_prefix: str = DEFAULT_FILE_PREFIX
+    _indexed_attributes: Tuple[str, ...] = ()
+    _indexes: Dict[str, Dict[Any, Dict[str, None]]] = {}
+    _indexed_values: Dict[str, Dict[str, Any]] = {}
+
+    def __init_subclass__(cls, **kwargs: Any) -> None:
+        """Give every subclass its own storage once, at class creation."""
+        super().__init_subclass__(**kwargs)
+        cls._storage = {}
+        cls._indexes = {attr: {} for attr in cls._indexed_attributes}
+        cls._indexed_values = {}
 
     def __init__(self, *args: List[Any], **kwargs: Dict[str, Any]):
         """
@@ -139,25 +165,32 @@ class Base:
 
         Args:
             id (str, optional): The unique identifier for the object. If not
-                                 provided, a new UUID will be generated.
+                                 provided, a random hex ID is generated.
             created_at (datetime or str, optional): The timestamp of when the
                                                      object was created.
             updated_at (datetime or str, optional): The timestamp of the last
                                                      update to the object.
         """
-        self.id = kwargs.get('id', str(uuid.uuid4()))
-        self.created_at = kwargs.get('created_at', datetime.utcnow())
-        self.updated_at = kwargs.get('updated_at', datetime.utcnow())
-
-        if isinstance(self.created_at, str):
-            self.created_at = \
-                datetime.strptime(self.created_at, TIMESTAMP_FORMAT)
-        if isinstance(self.updated_at, str):
-            self.updated_at = \
-                datetime.strptime(self.updated_at, TIMESTAMP_FORMAT)
-
-        # Ensure class-level storage exists
-        self.__class__.init_storage()
+        self.id = kwargs.get('id') or secrets.token_hex(16)
+        created_at = kwargs.get('created_at')
+        updated_at = kwargs.get('updated_at')
+
+        # Only read the clock when a timestamp is missing (i.e. new objects)
+        if created_at is None or updated_at is None:
+            now = datetime.utcnow()
+            created_at = now if created_at is None else created_at
+            updated_at = now if updated_at is None else updated_at
+
+        self.created_at = self._parse_datetime(created_at)
+        self.updated_at = self._parse_datetime(updated_at)
+
+    def __setattr__(self, name: str, value: Any) -> None:
+        """Set an attribute, keeping the indexes of stored objects current."""
+        super().__setattr__(name, value)
+        if name in self._indexed_attributes:
+            cls = self.__class__
+            if cls._storage.get(self.__dict__.get('id')) is self:
+                cls._index_object(self)
 
     @staticmethod
     def _parse_datetime(value: Any) -> datetime:
@@ -183,8 +216,14 @@ class Base:
 
     @classmethod
     def _get_file_path(cls) -> str:
-        """Return the file path for storing objects."""
-        return f"{cls._file_prefix}{cls.__name__}.json"
+        """Return the file path for storing objects, computed once."""
+        # Read from the class's own namespace so subclasses never
+        # inherit a parent's cached path
+        file_path = cls.__dict__.get("_file_path")
+        if file_path is None:
+            file_path = f"{cls._file_prefix}{cls.__name__}.json"
+            cls._file_path = file_path
+        return file_path
 
     @classmethod
     def init_storage(cls) -> None:
@@ -192,6 +231,96 @@ class Base:
         if not hasattr(cls, "_storage"):
             cls._storage = {}
 
+    @classmethod
+    def _index_object(cls, obj: 'Base') -> None:
+        """
+        Add or refresh the index entries of an object.
+
+        Entries whose value did not change are left in place, so that the
+        IDs in each bucket keep following the storage order.
+        """
+        old_values = cls._indexed_values.get(obj.id, {})
+
+        values = {}
+        for attr in cls._indexed_attributes:
+            value = getattr(obj, attr, None)
+            if attr in old_values:
+                if old_values[attr] == value:
+                    values[attr] = old_values[attr]
+                    continue
+                cls._discard_index_entry(attr, old_values[attr], obj.id)
+            try:
+                # Dictionaries keep the IDs in insertion order
+                ids = cls._indexes[attr].setdefault(value, {})
+            except TypeError:
+                continue  # Unhashable values are left to the full scan
+            ids[obj.id] = None
+            if attr in old_values and len(ids) > 1:
+                # A stored object moved into a populated bucket; put the
+                # bucket back in storage order (rare, so a scan is fine)
+                cls._indexes[attr][value] = {
+                    obj_id: None for obj_id in cls._storage if obj_id in ids
+                }
+            values[attr] = value
+        cls._indexed_values[obj.id] = values
+
+    @classmethod
+    def _unindex_object(cls, obj_id: str) -> None:
+        """Remove the index entries of an object."""
+        values = cls._indexed_values.pop(obj_id, None)
+        if not values:
+            return
+
+        for attr, value in values.items():
+            cls._discard_index_entry(attr, value, obj_id)
+
+    @classmethod
+    def _discard_index_entry(cls, attr: str, value: Any, obj_id: str) -> None:
+        """Remove an object's ID from the bucket of one indexed value."""
+        ids = cls._indexes[attr].get(value)
+        if ids is None:
+            return
+        ids.pop(obj_id, None)
+        if not ids:
+            del cls._indexes[attr][value]
+
+    @classmethod
+    def _rebuild_indexes(cls) -> None:
+        """Rebuild every index from the objects in storage."""
+        cls._indexes = {attr: {} for attr in cls._indexed_attributes}
+        cls._indexed_values = {}
+        for obj in cls._storage.values():
+            cls._index_object(obj)
+
+    @classmethod
+    def lookup_index(
+            cls, attributes: Dict[str, Any]
+    ) -> Optional[List[str]]:
+        """
+        Return the IDs of the objects matching every indexed attribute
+        in `attributes`, or None if none of them is indexed.
+        """
+        ids = None
+        for attr, value in attributes.items():
+            index = cls._indexes.get(attr)
+            if index is None:
+                continue
+
+            try:
+                matches = index.get(value, {})
+            except TypeError:
+                continue
+
+            if ids is None:
+                ids = list(matches)
+            else:
+                ids = [obj_id for obj_id in ids if obj_id in matches]
+
+            if not ids:
+                break
+
+        return ids
+
     @classmethod
     def load_from_file(cls) -> None:
         """Load objects from a file into storage."""
@@ -205,27 +334,39 @@ class Base:
                 obj_id: cls(**obj_data)
                 for obj_id, obj_data in objects.items()
             }
+        cls._rebuild_indexes()
 
     @classmethod
     def save_to_file(cls) -> None:
-        """Save all objects to a file."""
+        """
+        Save all objects to a file.
+
+        The data is written to a temporary file first and then atomically
+        renamed over the real one, so readers never see a partial file.
+        """
         file_path = cls._get_file_path()
-        with open(file_path, "w") as f:
+        tmp_path = f"{file_path}.tmp"
+        with open(tmp_path, "w") as f:
             json.dump({
                 obj_id: obj.to_json(for_serialization=True)
                 for obj_id, obj in cls._storage.items()
             }, cast(io.TextIOWrapper, f))
+            f.flush()
+            os.fsync(f.fileno())
+        os.replace(tmp_path, file_path)
 
     def save(self) -> None:
         """Save the current object to storage."""
         self.updated_at = datetime.utcnow()
         self.__class__._storage[self.id] = self
+        self.__class__._index_object(self)
         self.__class__.save_to_file()
 
     def remove(self) -> None:
         """Remove the object from storage."""
         if self.id in self.__class__._storage:
             del self.__class__._storage[self.id]
+            self.__class__._unindex_object(self.id)
             self.__class__.save_to_file()
 
     @classmethod
@@ -243,6 +384,17 @@ class Base:
         """Get an object by ID."""
         return cls._storage.get(obj_id)
 
+    @classmethod
+    def get_many(cls, obj_ids: Iterable[str]) -> List[Optional[BaseType]]:
+        """
+        Get several objects by ID in one call.
+
+        The result keeps the order of `obj_ids`, with None in place of
+        any ID that is not found.
+        """
+        storage = cls._storage
+        return [storage.get(obj_id) for obj_id in obj_ids]
+
     @classmethod
     def get_all_objects(cls) -> Generator['BaseType', None, None]:
         """Generator to yield all objects stored in the class."""
@@ -2,10 +2,11 @@
 """
 User class for managing user data
 """
+import hmac
 from typing import List, Dict, Any, Optional
 
 from models.base import Base
-from utils import encrypt_sha256
+from utils import encrypt_sha256_unchecked
 
 
 class User(Base):
@@ -13,6 +14,8 @@ class User(Base):
     Represents a user with attributes like email, password, and full name.
     """
 
+    _indexed_attributes = ('email',)
+
     def __init__(self, *args: List[Any], **kwargs: Dict[str, Any]):
         """Initializes a User instance with optional attributes."""
         super().__init__(*args, **kwargs)
@@ -22,6 +25,28 @@ class User(Base):
         self.first_name: Optional[str] = kwargs.get('first_name')
         self.last_name: Optional[str] = kwargs.get('last_name')
 
+    @property
+    def email(self) -> Optional[str]:
+        """Returns the user's normalized email address."""
+        return self.__dict__.get('email')
+
+    @email.setter
+    def email(self, value: Optional[str]):
+        """
+        Normalizes and sets the email address.
+
+        The value is kept in the instance `__dict__` under `email` so that
+        `to_json` keeps serializing it like any other public attribute.
+        """
+        self.__dict__['email'] = self.normalize_email(value)
+
+    @staticmethod
+    def normalize_email(email: Optional[str]) -> Optional[str]:
+        """Returns the email stripped and lower-cased for lookups."""
+        if not isinstance(email, str):
+            return email
+        return email.strip().lower()
+
     @property
     def password(self) -> Optional[str]:
         """Returns the user's encrypted password."""
@@ -33,13 +58,15 @@ class User(Base):
         if not isinstance(pwd, str) or not pwd:
             self._password = None
         else:
-            self._password = encrypt_sha256(pwd)
+            self._password = encrypt_sha256_unchecked(pwd)
 
     def is_valid_password(self, pwd: str) -> bool:
         """Checks if the provided password matches the stored password."""
         if not isinstance(pwd, str) or not pwd or not self.password:
             return False
-        return encrypt_sha256(pwd) == self.password
+        return hmac.compare_digest(
+            encrypt_sha256_unchecked(pwd), self.password
+        )
 
     def display_name(self) -> str:
         """Generates a display name based on the user's attributes."""
@@ -14,6 +14,8 @@ class UserSession(Base):
     instead of in memory.
     """
 
+    _indexed_attributes = ('session_id', 'user_id')
+
     def __init__(self, *args: list, **kwargs: dict):
         """
         Initializes a new UserSession instance with user_id and session_id.
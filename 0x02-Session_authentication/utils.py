@@ -9,8 +9,14 @@ Functions:
     override:
         Decorator to enforce that a method must be overridden
         in a subclass.
+    enforce_overrides:
+        Checks, at subclass creation, that every `@override` method
+        has been overridden.
     encrypt_sha256:
         Encrypts a string using the SHA256 hashing algorithm.
+    encrypt_sha256_unchecked:
+        Same as `encrypt_sha256`, minus the type check, for
+        callers that already validated their input.
     parse_int_str:
         Parses a string into an integer, returning a default value
         if parsing fails.
@@ -24,50 +30,56 @@ Classes:
 The utilities aim to ensure code consistency, security,
 and better error handling.
 """
-from datetime import datetime, timedelta
 from typing import Any, Optional
-import functools
+import array
 import hashlib
+import heapq
+import itertools
+import time
 
 
 def override(method):
     """
     Decorator to enforce that a method must be overridden in a subclass.
 
-    This decorator ensures that any subclass of a base class using
-    the `@override` decorator must override the decorated method.
-    If the subclass does not provide its implementation, an error is raised.
+    The method is only marked and returned unchanged, so decorated methods
+    cost nothing extra per call. The check itself runs once, when a
+    subclass is created, through `enforce_overrides`, which the base class
+    must call from its `__init_subclass__`.
 
     Args:
         method (function): The method to be decorated.
 
     Returns:
-        function: The wrapper function that enforces the override.
+        function: The same method, marked as requiring an override.
+    """
+    method.__override_required__ = True
+    return method
+
+
+def enforce_overrides(cls: type) -> None:
+    """
+    Ensure `cls` overrides every method marked with `@override` in
+    its base classes.
+
+    Args:
+        cls (type): The newly created subclass to check.
 
     Raises:
-        NotImplementedError: If the method is not overridden in the subclass.
+        NotImplementedError: If a marked method is not overridden.
     """
-    @functools.wraps(method)
-    def wrapper(self, *args, **kwargs):
-        # Check if the method exists in the subclass
-        if method.__name__ in self.__class__.__dict__:
-            # Ensure that the method is not the base class method
-            if self.__class__.__dict__[method.__name__] is method:
+    for base in cls.__mro__[1:]:
+        for name, attr in vars(base).items():
+            if not getattr(attr, "__override_required__", False):
+                continue
+
+            # The subclass still resolves to the base implementation
+            if getattr(cls, name, None) is attr:
                 raise NotImplementedError(
-                    f"The method `{method.__name__}` "
+                    f"The method `{name}` "
                     f"must be overridden in the subclass "
-                    f"`{self.__class__.__name__}`."
+                    f"`{cls.__name__}`."
                 )
-        else:
-            # If the method is not implemented in the subclass, raise an error
-            raise NotImplementedError(
-                f"The method `{method.__name__}` "
-                f"must be overridden in the subclass "
-                f"`{self.__class__.__name__}`."
-            )
-        return method(self, *args, **kwargs)
-
-    return wrapper
 
 
 def encrypt_sha256(value: str) -> str:
@@ -83,7 +95,24 @@ def encrypt_sha256(value: str) -> str:
     """
     if not isinstance(value, str):
         raise TypeError("Input to encrypt_sha256 must be a string.")
-    return hashlib.sha256(value.encode()).hexdigest().lower()
+    return encrypt_sha256_unchecked(value)
+
+
+def encrypt_sha256_unchecked(value: str) -> str:
+    """
+    Encrypt the input string using SHA256, without validating its type.
+
+    Meant for internal callers that have already checked that `value`
+    is a string, so the check is not repeated on every call.
+
+    Args:
+        value (str): The string to be encrypted.
+
+    Returns:
+        str: The SHA256 hash of the input string in
+            lowercase hexadecimal format.
+    """
+    return hashlib.sha256(value.encode("utf-8")).hexdigest()
 
 
 def parse_int_str(value: str, default: int = 0) -> int:
@@ -98,9 +127,19 @@ def parse_int_str(value: str, default: int = 0) -> int:
     Returns:
         int: Parsed integer value or the default value.
     """
+    if not isinstance(value, str):
+        return default
+
+    # Validate up front so malformed input never raises and unwinds
+    text = value.strip()
+    digits = text[1:] if text[:1] in ("-", "+") else text
+    if not digits.isdecimal():
+        return default
+
     try:
-        return int(value)
-    except (ValueError, TypeError):
+        return int(text)
+    except ValueError:
+        # Digit strings past the interpreter's int conversion limit
         return default
 
 
@@ -109,12 +148,32 @@ class ExpiringDict:
     A dictionary that automatically deletes expired keys when accessed.
     This does not inherit from dict but mimics its behavior.
 
+    Entries live in slots of two parallel arrays: `_values` holds the
+    values and `_deadlines` the integer `time.monotonic_ns()` deadlines,
+    while `_data` maps each key to its slot. Freed slots are pushed onto
+    a free list and reused, so inserts allocate no per-entry record.
+    Deadlines are also pushed onto a min-heap so expired entries can be
+    evicted in bulk without scanning the whole dictionary.
+
     Attributes:
         expiration_time (int): The expiration time for keys in seconds.
             If set to 0, keys do not expire.
-        _data (dict): A dictionary storing the actual data with timestamps.
+        _data (dict): A dictionary mapping each key to its slot.
+        _values (list): The value stored in each slot.
+        _deadlines (array): The deadline of each slot, in nanoseconds.
+        _free (list): The indexes of the slots available for reuse.
+        _expiration_ns (int): The expiration time in nanoseconds.
+        _heap (list): A min-heap of `(expires_at, seq, key)` entries.
+        _counter (itertools.count): Supplies `seq`, a tie-breaker that
+            keeps equal deadlines from falling back to comparing keys,
+            which may be of mutually unorderable types.
     """
 
+    __slots__ = (
+        "expiration_time", "_expiration_ns", "_data", "_values",
+        "_deadlines", "_free", "_heap", "_counter"
+    )
+
     def __init__(self, expiration_time: int = 0) -> None:
         """
         Initialize the ExpiringDict with an expiration time.
@@ -125,7 +184,13 @@ class ExpiringDict:
                 Defaults to 0 (no expiration).
         """
         self.expiration_time = expiration_time
+        self._expiration_ns = int(expiration_time * 1_000_000_000)
         self._data = {}
+        self._values = []
+        self._deadlines = array.array("q")
+        self._free = []
+        self._heap = []
+        self._counter = itertools.count()
 
     def get(self, key: Any, default: Optional[Any] = None) -> Optional[Any]:
         """
@@ -141,9 +206,13 @@ class ExpiringDict:
             Optional[Any]: The value associated with the key,
                 or the default value if expired or not found.
         """
-        if key in self._data:
-            return self[key]
-        return default
+        self._sweep()
+
+        slot = self._data.get(key)
+        if slot is None:
+            return default
+
+        return self._values[slot]
 
     def __getitem__(self, key: Any) -> Optional[Any]:
         """
@@ -157,21 +226,13 @@ class ExpiringDict:
             Optional[Any]: The value associated with the key,
                 or None if expired or not found.
         """
-        if key not in self._data:
-            return None
-
-        value = self._data[key]
-        created_at = value.get("created_at")
+        self._sweep()
 
-        if not created_at:
-            self.expire_key(key)
+        slot = self._data.get(key)
+        if slot is None:
             return None
 
-        if not self._is_valid(key):
-            self.expire_key(key)
-            return None
-
-        return value['value']
+        return self._values[slot]
 
     def expire_key(self, key: Any) -> None:
         """
@@ -181,17 +242,38 @@ class ExpiringDict:
             key (Any): The key to expire.
         """
         if key in self._data:
-            del self._data[key]
+            self._release(key)
 
     def __setitem__(self, key: Any, value: Any) -> None:
         """
-        Store an item in the dictionary with a creation timestamp.
+        Store an item in the dictionary with an expiration deadline.
 
         Args:
             key (Any): The key to store.
             value (Any): The value associated with the key to store.
         """
-        self._data[key] = {"value": value, "created_at": datetime.now()}
+        self._sweep()
+
+        expires_at = 0
+        if self._expiration_ns > 0:
+            expires_at = time.monotonic_ns() + self._expiration_ns
+            heapq.heappush(
+                self._heap, (expires_at, next(self._counter), key)
+            )
+
+        slot = self._data.get(key)
+        if slot is None:
+            if self._free:
+                slot = self._free.pop()
+            else:
+                # No free slot left, grow both arrays by one
+                slot = len(self._values)
+                self._values.append(None)
+                self._deadlines.append(0)
+            self._data[key] = slot
+
+        self._values[slot] = value
+        self._deadlines[slot] = expires_at
 
     def __delitem__(self, key: Any) -> None:
         """
@@ -204,13 +286,13 @@ class ExpiringDict:
             KeyError: If the key is not found in the dictionary.
         """
         if key in self._data:
-            del self._data[key]
+            self._release(key)
         else:
             raise KeyError(f"{key} not found in the dictionary.")
 
     def __contains__(self, key: Any) -> bool:
         """
-        Check if a key exists in the dictionary.
+        Check if a key exists in the dictionary and is not expired.
 
         Args:
             key (Any): The key to check for existence.
@@ -218,6 +300,7 @@ class ExpiringDict:
         Returns:
             bool: True if the key exists in the dictionary, False otherwise.
         """
+        self._sweep()
         return key in self._data
 
     def __iter__(self) -> None:
@@ -247,11 +330,7 @@ class ExpiringDict:
             str: A string representation of the
                 valid (non-expired) key-value pairs.
         """
-        valid_items = {
-            key: value['value']
-            for key, value in self._data.items() if self._is_valid(key)
-        }
-        return str(valid_items)
+        return str(self._valid_items())
 
     def __repr__(self) -> str:
         """
@@ -262,33 +341,47 @@ class ExpiringDict:
             str: A formal string representation of
                 the valid (non-expired) key-value pairs.
         """
-        valid_items = {
-            key: value['value']
-            for key, value in self._data.items() if self._is_valid(key)
-        }
-        return f"ExpiringDict({valid_items})"
+        return f"ExpiringDict({self._valid_items()})"
 
-    def _is_valid(self, key: Any) -> bool:
+    def _valid_items(self) -> dict:
         """
-        Helper method to check if a key's session is valid (not expired).
+        Return the valid (non-expired) key-value pairs.
 
-        Args:
-            key (Any): The key to check.
+        Expired entries are evicted by the heap sweep beforehand, so the
+        remaining entries are copied in one pass with no time checks.
 
         Returns:
-            bool: True if the key is valid (not expired), False otherwise.
+            dict: The valid key-value pairs.
         """
-        if self.expiration_time <= 0:
-            return True
+        self._sweep()
+        values = self._values
+        return {key: values[slot] for key, slot in self._data.items()}
 
-        if key not in self._data:
-            return False
+    def _release(self, key: Any) -> None:
+        """
+        Remove a key and put its slot back on the free list.
 
-        value = self._data[key]
-        created_at = value.get("created_at")
+        Args:
+            key (Any): The key to remove, which must be present.
+        """
+        slot = self._data.pop(key)
+        self._values[slot] = None  # Drop the reference to the value
+        self._free.append(slot)
 
-        if not created_at:
-            return False
+    def _sweep(self) -> None:
+        """
+        Evict every expired entry, earliest deadline first.
 
-        expiration_time = created_at + timedelta(seconds=self.expiration_time)
-        return expiration_time >= datetime.now()
+        Heap entries whose key was since overwritten or deleted no longer
+        match the deadline of its slot and are simply dropped.
+        """
+        heap = self._heap
+        if not heap:
+            return
+
+        now = time.monotonic_ns()
+        while heap and heap[0][0] < now:
+            expires_at, _, key = heapq.heappop(heap)
+            slot = self._data.get(key)
+            if slot is not None and self._deadlines[slot] == expires_at:
+                self._release(key)
@@ -2,20 +2,89 @@
 """
 Simple Flask app with a single GET route returning a JSON message.
 """
-from flask import Flask, jsonify, request, abort, make_response, redirect
+from typing import Any, Optional, Sequence, Tuple
+
+import orjson
+from flask import Flask, Response, request, abort, redirect
 from werkzeug.exceptions import BadRequest
 
 from auth import Auth
+from db import DB
 
 # Initialize Flask app
 app = Flask(__name__)
 AUTH = Auth()
+DATABASE = DB()
+
+# Constant response bodies, encoded once at import time
+HOME_BODY = orjson.dumps({"message": "Bienvenue"})
+CREDENTIALS_REQUIRED_BODY = orjson.dumps(
+    {"message": "email and password are required"}
+)
+EMAIL_REGISTERED_BODY = orjson.dumps({"message": "email already registered"})
+
+# Session cookie headers. Session IDs are hex tokens, optionally signed,
+# made of URL-safe characters, so the value needs no quoting and is formatted
+# straight into the template.
+SESSION_COOKIE_TEMPLATE = "session_id={}; Path=/; HttpOnly; SameSite=Lax"
+CLEAR_SESSION_COOKIE = "session_id=; Max-Age=0; Path=/; HttpOnly; SameSite=Lax"
+
+
+def json_response(
+        data: Any, status: int = 200,
+        headers: Optional[Sequence[Tuple[str, str]]] = None
+) -> Response:
+    """
+    Build a JSON response, encoding the payload with orjson.
+
+    Args:
+        data (Any): The JSON-serializable payload, or an already
+            encoded JSON body as bytes, which is used as-is.
+        status (int): The HTTP status code. Defaults to 200.
+        headers (Optional[Sequence[Tuple[str, str]]]): Extra headers
+            to send with the response.
+
+    Returns:
+        Response: The response with an `application/json` body.
+    """
+    body = data if isinstance(data, bytes) else orjson.dumps(data)
+    return Response(
+        body, status=status, headers=headers, mimetype="application/json"
+    )
+
+
+def get_session_id() -> Optional[str]:
+    """
+    Read the `session_id` cookie straight from the raw `Cookie` header.
+
+    Only one cookie is needed, so this scans the header once instead of
+    building Werkzeug's full cookie mapping.
+
+    Returns:
+        Optional[str]: The session ID, or None if the cookie is missing.
+    """
+    raw_cookies = request.environ.get("HTTP_COOKIE")
+    if not raw_cookies:
+        return None
+
+    for pair in raw_cookies.split(";"):
+        name, sep, value = pair.strip().partition("=")
+        if sep and name == "session_id":
+            return value
+
+    return None
+
+
+@app.teardown_appcontext
+def close_db_session(error: Optional[BaseException] = None) -> None:
+    """Commit or roll back the request's database session and remove it."""
+    DATABASE.teardown(error)
 
 
 @app.route("/", methods=["GET"], strict_slashes=False)
 def home():
     """Return a JSON response with a message"""
-    return jsonify({"message": "Bienvenue"})
+    return json_response(HOME_BODY)
 
 
 @app.route("/users", methods=["POST"], strict_slashes=False)
@@ -28,17 +97,18 @@ def users():
     a success message. If the email is already registered, it returns
     an error message with a 400 status code.
     """
-    email = request.form.get("email")
-    password = request.form.get("password")
+    form = request.form
+    email = form.get("email")
+    password = form.get("password")
 
     if not email or not password:
-        return jsonify({"message": "email and password are required"}), 400
+        return json_response(CREDENTIALS_REQUIRED_BODY, 400)
 
     try:
         user = AUTH.register_user(email, password)
-        return jsonify({"email": user.email, "message": "user created"}), 200
+        return json_response({"email": user.email, "message": "user created"})
     except ValueError:
-        return jsonify({"message": "email already registered"}), 400
+        return json_response(EMAIL_REGISTERED_BODY, 400)
 
 
 @app.route("/sessions", methods=["POST"], strict_slashes=False)
@@ -52,24 +122,22 @@ def login():
         JSON response with email and message if successful.
         Aborts with 401 status code if login credentials are invalid.
     """
-    email = request.form.get("email")
-    password = request.form.get("password")
+    form = request.form
+    email = form.get("email")
+    password = form.get("password")
 
     if not email or not password:
         abort(401)
 
-    # Validate login credentials
-    if not AUTH.valid_login(email, password):
-        abort(401)
-
-    # Create session and set session_id cookie
-    session_id = AUTH.create_session(email)
+    # Validate login credentials and create the session
+    session_id = AUTH.login(email, password)
     if not session_id:
         abort(401)
 
-    response = make_response(jsonify({"email": email, "message": "logged in"}))
-    response.set_cookie("session_id", session_id)
-    return response
+    return json_response(
+        {"email": email, "message": "logged in"},
+        headers=(("Set-Cookie", SESSION_COOKIE_TEMPLATE.format(session_id)),)
+    )
 
 
 @app.route("/sessions", methods=["DELETE"], strict_slashes=False)
@@ -79,14 +147,17 @@ def logout():
     the session_id cookie. Redirects to the homepage if successful,
     returns a 403 if the session is invalid.
     """
-    session_id = request.cookies.get("session_id")
+    session_id = get_session_id()
     if not session_id:
         abort(403)  # Forbidden if no session_id
 
     user = AUTH.get_user_from_session_id(session_id)
     if user:
         AUTH.destroy_session(user.id)
-        return redirect("/")  # Redirect to the homepage after logout
+        # Redirect to the homepage after logout, clearing the cookie
+        response = redirect("/")
+        response.headers.add("Set-Cookie", CLEAR_SESSION_COOKIE)
+        return response
 
     # If no valid user found, respond with 403 Forbidden
     abort(403)
@@ -99,13 +170,13 @@ def profile():
     the session_id cookie. Responds with 403 if the session is invalid
     or the user does not exist.
     """
-    session_id = request.cookies.get("session_id")
+    session_id = get_session_id()
     if not session_id:
         abort(403)  # Forbidden if no session_id
 
     user = AUTH.get_user_from_session_id(session_id)
     if user:
-        return jsonify({"email": user.email})
+        return json_response({"email": user.email})
 
     # If no valid user found, respond with 403 Forbidden
     abort(403)
@@ -123,10 +194,10 @@ def reset_password():
 
     try:
         reset_token = AUTH.get_reset_password_token(email)
-        return jsonify({
+        return json_response({
             "email": email,
             "reset_token": reset_token
-        }), 200
+        })
     except ValueError:
         # If the user is not found, respond with a 403 Forbidden error
         abort(403, description="Email not registered")
@@ -139,9 +210,10 @@ def update_password():
     the provided email and reset_token.
     """
     try:
-        email = request.form.get('email')
-        reset_token = request.form.get('reset_token')
-        new_password = request.form.get('new_password')
+        form = request.form
+        email = form.get('email')
+        reset_token = form.get('reset_token')
+        new_password = form.get('new_password')
 
         if not email:
             raise BadRequest("Email is required.")
@@ -152,7 +224,7 @@ def update_password():
 
         AUTH.update_password(reset_token, new_password)
 
-        return jsonify({"email": email, "message": "Password updated"}), 200
+        return json_response({"email": email, "message": "Password updated"})
     except ValueError:
         # In case of an invalid reset token
         abort(403)
@@ -162,7 +234,7 @@ def update_password():
             "error": "Bad Request",
             "message": str(e)
         }
-        return jsonify(error_message), 400
+        return json_response(error_message, 400)
 
 
 @app.route('/users/<email>', methods=['DELETE'], strict_slashes=False)
@@ -171,10 +243,10 @@ def delete_user(email: str):
     try:
         # Call the Auth class method to delete the user
         AUTH.unregister_user(email)
-        return jsonify({"message": "user deleted"}), 200
+        return json_response({"message": "user deleted"})
     except ValueError:
         # If the user does not exist, raise a 404 error
-        return jsonify({"message": "User not found"}), 404
+        return json_response({"message": "User not found"}, 404)
 
 
 # Run the app on host 0.0.0.0 and port 5000
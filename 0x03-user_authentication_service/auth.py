@@ -12,14 +12,36 @@ and authentication, including checking if a user exists, securely hashing
 their password before storing it, and validating user credentials.
 
 Functions:
-    _hash_password(password: str) -> bytes:
+    _to_bytes(value: Union[str, bytes, bytearray]) -> bytes:
+        Encodes a string to UTF-8, passing bytes through as bytes.
+
+    _normalize_email(email: Any) -> Optional[str]:
+        Strips and lowercases an email address for storage and lookup,
+        or returns None if it is not a string.
+
+    _hash_password(password: Union[str, bytes]) -> bytes:
         Hashes the given password using bcrypt and returns the hash as a
         binary string.
 
+    _hash_passwords_batch(passwords: Iterable[Union[str, bytes]])
+            -> List[bytes]:
+        Hashes several passwords in parallel on the hashing thread pool.
+
+    _check_password(password: Union[str, bytes],
+                    hashed_password: bytes) -> bool:
+        Checks a plain text password against a stored bcrypt hash.
+
+    _needs_rehash(hashed_password: bytes) -> bool:
+        Tells whether a stored hash uses a different bcrypt work factor.
+
     _generate_uuid() -> str:
-        Generates a new UUID and returns it as a string. This function
-        is private and intended for internal use to create unique
-        identifiers such as session tokens.
+        Generates a new random 128-bit token and returns it as a hex
+        string. This function is private and intended for internal use
+        to create unique identifiers such as reset tokens.
+
+    _generate_session_id() -> str:
+        Generates a new random token, signed with SESSION_SECRET when it
+        is set, used as a session ID.
 
 Classes:
     Auth:
@@ -28,45 +50,193 @@ Classes:
         credentials, and manage user data securely.
 """
 
-import uuid
-from typing import Optional
+import os
+import secrets
+from concurrent.futures import ThreadPoolExecutor
+from typing import Any, Iterable, List, Optional, Union
 
 from sqlalchemy.orm.exc import NoResultFound
+from itsdangerous import Signer
 import bcrypt
 
 from user import User
 from db import DB
 
+# bcrypt work factor, read once at import time
+BCRYPT_ROUNDS = int(os.getenv("BCRYPT_ROUNDS", "12"))
+
+# bcrypt only uses the first 72 bytes of a password; newer releases
+# raise on longer input instead of ignoring the rest
+BCRYPT_MAX_PASSWORD_BYTES = 72
+
+# Key for signing session IDs. Every process serving the app must share
+# it; without one, session IDs are plain random tokens and are not signed.
+SESSION_SECRET = os.getenv("SESSION_SECRET")
+_session_signer = (
+    Signer(SESSION_SECRET, salt="session_id") if SESSION_SECRET else None
+)
+
+# Pre-bound bcrypt entry points, skipping the module attribute lookups
+_hashpw = bcrypt.hashpw
+_gensalt = bcrypt.gensalt
+_checkpw = bcrypt.checkpw
+
+# bcrypt releases the GIL while hashing, so one thread per core lets
+# concurrent hashes run in parallel instead of queueing on a single worker
+_HASH_POOL = ThreadPoolExecutor(
+    max_workers=os.cpu_count(), thread_name_prefix="bcrypt"
+)
+
+
+def _to_bytes(value: Union[str, bytes, bytearray]) -> bytes:
+    """
+    Returns the UTF-8 encoding of a string, or the value as bytes if it is
+    already bytes or a bytearray.
+
+    Args:
+        value (Union[str, bytes, bytearray]): The text or bytes to convert.
 
-def _hash_password(password: str) -> bytes:
+    Returns:
+        bytes: The value as bytes.
+    """
+    if isinstance(value, (bytes, bytearray)):
+        return bytes(value)
+    return value.encode()
+
+
+def _check_password(
+        password: Union[str, bytes], hashed_password: bytes
+) -> bool:
+    """
+    Checks a plain text password against a stored bcrypt hash.
+
+    The check runs on the shared hashing thread pool, so concurrent login
+    attempts are spread over the available cores and bounded by them.
+
+    Args:
+        password (Union[str, bytes]): The plain text password to check.
+        hashed_password (bytes): The stored bcrypt hash.
+
+    Returns:
+        bool: True if the password matches the hash, False otherwise.
+    """
+    return _HASH_POOL.submit(
+        _checkpw,
+        _to_bytes(password)[:BCRYPT_MAX_PASSWORD_BYTES],
+        hashed_password
+    ).result()
+
+
+def _normalize_email(email: Any) -> Optional[str]:
+    """
+    Normalizes an email address for storage and lookup.
+
+    Emails are stored in this form, so lookups and the unique constraint
+    on email are case-insensitive and ignore surrounding whitespace.
+
+    Args:
+        email (Any): The email address as supplied by the caller.
+
+    Returns:
+        Optional[str]: The stripped, lowercased email address, or None
+            if `email` is not a string.
+    """
+    if not isinstance(email, str):
+        return None
+
+    return email.strip().lower()
+
+
+def _hash_passwords_batch(
+        passwords: Iterable[Union[str, bytes]]
+) -> List[bytes]:
+    """
+    Hashes several passwords with bcrypt in parallel.
+
+    Every password is submitted to the shared hashing thread pool before
+    any result is awaited, so the hashes run on all available cores.
+
+    Args:
+        passwords (Iterable[Union[str, bytes]]): The plain text passwords
+            to be hashed.
+
+    Returns:
+        List[bytes]: The hashed passwords, in the same order.
+    """
+    futures = [
+        _HASH_POOL.submit(
+            _hashpw,
+            _to_bytes(password)[:BCRYPT_MAX_PASSWORD_BYTES],
+            _gensalt(BCRYPT_ROUNDS)
+        )
+        for password in passwords
+    ]
+    return [future.result() for future in futures]
+
+
+def _hash_password(password: Union[str, bytes]) -> bytes:
     """
     Hashes the given password using bcrypt and returns the
     hash as a binary string.
 
     This method takes a plain text password, generates a random salt,
-    and applies the bcrypt algorithm to hash the password. The result
-    is returned in binary format.
+    and applies the bcrypt algorithm to hash the password. The work is
+    run on the shared hashing thread pool and the result is returned in
+    binary format.
 
     Args:
-        password (str): The plain text password to be hashed.
+        password (Union[str, bytes]): The plain text password to be hashed.
 
     Returns:
         bytes: The hashed password in binary format,
                including the salt and the bcrypt hash.
     """
-    return bcrypt.hashpw(password.encode(), bcrypt.gensalt())
+    return _hash_passwords_batch((password,))[0]
+
+
+def _needs_rehash(hashed_password: bytes) -> bool:
+    """
+    Tells whether a stored bcrypt hash was made with a different work
+    factor than the current BCRYPT_ROUNDS.
+
+    Args:
+        hashed_password (bytes): The stored bcrypt hash, in the
+            "$2b$<cost>$<salt+hash>" format.
+
+    Returns:
+        bool: True if the hash should be recomputed at the current cost.
+    """
+    return int(hashed_password[4:6]) != BCRYPT_ROUNDS
 
 
 def _generate_uuid() -> str:
     """
-    Generates a new UUID and returns it as a string.
+    Generates a new random 128-bit token and returns it as a string.
 
     This is a private method meant for internal use in the auth module.
 
     Returns:
-        str: The string representation of a new UUID.
+        str: A 32-character hex string drawn from the OS CSPRNG.
     """
-    return str(uuid.uuid4())
+    return secrets.token_hex(16)
+
+
+def _generate_session_id() -> str:
+    """
+    Generates a new session ID: a random token, signed with SESSION_SECRET
+    when it is set.
+
+    The signature lets forged or malformed session IDs be rejected
+    without a database lookup.
+
+    Returns:
+        str: The session ID.
+    """
+    session_id = _generate_uuid()
+    if _session_signer is None:
+        return session_id
+
+    return _session_signer.sign(session_id).decode()
 
 
 class Auth:
@@ -77,6 +247,25 @@ class Auth:
     def __init__(self):
         self._db = DB()
 
+    def _find_user_by_email(self, email: Any) -> User:
+        """
+        Finds the user with the given email, after normalizing it.
+
+        Args:
+            email (Any): The email as supplied by the caller.
+
+        Returns:
+            User: The matching user.
+
+        Raises:
+            NoResultFound: If no user matches, or `email` is not a string.
+        """
+        email = _normalize_email(email)
+        if email is None:
+            raise NoResultFound("No user found matching the criteria.")
+
+        return self._db.find_user_by_email(email)
+
     def register_user(self, email: str, password: str) -> User:
         """
         Registers a new user in the system. The email and password are
@@ -91,17 +280,29 @@ class Auth:
             User: The newly created User object.
 
         Raises:
-            ValueError: If a user with the same email already exists.
+            ValueError: If the email is not a string or a user with the
+                same email already exists.
         """
-        # Check if user already exists
+        email = _normalize_email(email)
+        if email is None:
+            raise ValueError("Invalid email")
+
+        # Reject known emails before paying for a bcrypt hash; the unique
+        # constraint below still settles concurrent sign-ups
         try:
-            self._db.find_user_by(email=email)
+            self._db.find_user_by_email(email)
         except NoResultFound:
-            return self._db.add_user(
-                email=email, hashed_password=_hash_password(password)
-            )
+            pass
+        else:
+            raise ValueError(f"User {email} already exists")
+
+        user = self._db.add_user_if_absent(
+            email=email, hashed_password=_hash_password(password)
+        )
+        if user is None:
+            raise ValueError(f"User {email} already exists")
 
-        raise ValueError(f"User {email} already exists")
+        return user
 
     def unregister_user(self, email: str) -> None:
         """
@@ -114,6 +315,10 @@ class Auth:
            ValueError: If the user with the provided email is not found in
             the database.
        """
+        email = _normalize_email(email)
+        if email is None:
+            raise ValueError("User not found")
+
         return self._db.delete_user(email)
 
     def valid_login(self, email: str, password: str) -> bool:
@@ -128,9 +333,14 @@ class Auth:
             bool: True if the credentials are valid, False otherwise.
         """
         try:
-            user = self._db.find_user_by(email=email)
+            user = self._find_user_by_email(email)
             # Check password using bcrypt
-            if bcrypt.checkpw(password.encode(), user.hashed_password):
+            if _check_password(password, user.hashed_password):
+                if _needs_rehash(user.hashed_password):
+                    # Upgrade hashes made at an older work factor
+                    self._db.update_user(
+                        user.id, hashed_password=_hash_password(password)
+                    )
                 return True
         except NoResultFound:
             return False
@@ -148,14 +358,45 @@ class Auth:
             Optional[str]: The newly generated session ID if the user exists,
                  or None if the user does not exist.
         """
+        email = _normalize_email(email)
+        if email is None:
+            return None
+
+        session_id = _generate_session_id()
+        if not self._db.set_session_for_email(email, session_id):
+            return None
+
+        return session_id
+
+    def login(self, email: str, password: str) -> Optional[str]:
+        """
+        Validates login credentials and creates a new session in one go,
+        looking the user up only once.
+
+        Args:
+            email (str): The email of the user.
+            password (str): The password of the user.
+
+        Returns:
+            Optional[str]: The newly generated session ID if the
+                credentials are valid, or None otherwise.
+        """
         try:
-            user = self._db.find_user_by(email=email)
-            session_id = _generate_uuid()
-            self._db.update_user(user.id, session_id=session_id)
-            return session_id
+            user = self._find_user_by_email(email)
         except NoResultFound:
             return None
 
+        if not _check_password(password, user.hashed_password):
+            return None
+
+        changes = {"session_id": _generate_session_id()}
+        if _needs_rehash(user.hashed_password):
+            # Upgrade hashes made at an older work factor
+            changes["hashed_password"] = _hash_password(password)
+
+        self._db.update_user(user.id, **changes)
+        return changes["session_id"]
+
     def get_user_from_session_id(self, session_id: str) -> Optional[User]:
         """
         Retrieves a user object corresponding to the given session_id.
@@ -170,6 +411,13 @@ class Auth:
         if not session_id:
             return None
 
+        # Unsigned or tampered IDs can never match, skip the lookup
+        if (
+                _session_signer is not None
+                and not _session_signer.validate(session_id)
+        ):
+            return None
+
         try:
             return self._db.find_user_by(session_id=session_id)
         except NoResultFound:
@@ -204,7 +452,7 @@ class Auth:
             ValueError: If no user is found with the provided email.
         """
         try:
-            user = self._db.find_user_by(email=email)
+            user = self._find_user_by_email(email)
         except NoResultFound:
             raise ValueError("User not found")
 
@@ -225,13 +473,18 @@ class Auth:
             ValueError: If the reset_token is not valid or the
                 user cannot be found.
         """
+        # A missing token would match every user without a pending reset
+        if not reset_token or not isinstance(reset_token, str):
+            raise ValueError("Invalid reset token")
+
+        # Reject unknown tokens with an indexed lookup before paying for
+        # bcrypt; the conditional UPDATE below still makes a token single-use
         try:
-            user = self._db.find_user_by(reset_token=reset_token)
+            self._db.find_user_by(reset_token=reset_token)
         except NoResultFound:
             raise ValueError("Invalid reset token")
 
-        self._db.update_user(
-            user.id,
-            hashed_password=_hash_password(password),
-            reset_token=None
-        )
+        if not self._db.consume_reset_token(
+                reset_token, _hash_password(password)
+        ):
+            raise ValueError("Invalid reset token")
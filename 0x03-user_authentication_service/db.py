@@ -2,16 +2,74 @@
 """
 Database management class using SQLAlchemy.
 """
+from functools import lru_cache
 from threading import Lock
-from typing import Optional
-
-from sqlalchemy import create_engine
-from sqlalchemy.exc import SQLAlchemyError, InvalidRequestError
-from sqlalchemy.orm import sessionmaker, scoped_session
+from typing import Optional, Tuple
+
+from sqlalchemy import create_engine, bindparam, event, inspect
+from sqlalchemy.exc import (
+    SQLAlchemyError, InvalidRequestError, IntegrityError
+)
+from sqlalchemy.orm import (
+    Session, sessionmaker, scoped_session, make_transient_to_detached
+)
+from sqlalchemy.ext import baked
 from sqlalchemy.orm.exc import NoResultFound
+from sqlalchemy.pool import QueuePool
 
 from user import User, Base
 
+# Baked queries are compiled to SQL once and reused with new parameters
+_bakery = baked.bakery()
+
+
+@lru_cache(maxsize=16)
+def _user_query_for(keys: Tuple[str, ...]) -> baked.BakedQuery:
+    """
+    Builds a baked query selecting users whose attributes equal the bound
+    parameters of the same names, one per key.
+
+    The key tuple is part of the bake key, so each combination of
+    attributes gets its own cached SQL despite sharing the lambdas below.
+    Callers pass the keys sorted, so keyword order does not matter.
+    """
+    query = _bakery(lambda session: session.query(User))
+    query.add_criteria(
+        lambda q: q.filter(
+            *(getattr(User, key) == bindparam(key) for key in keys)
+        ),
+        keys
+    )
+    return query
+
+
+# Applied to every new SQLite connection: write-ahead logging lets reads
+# run alongside a writer, and NORMAL sync skips the fsync per commit that
+# WAL does not need for durability against application crashes.
+_SQLITE_PRAGMAS = (
+    "PRAGMA journal_mode=WAL",
+    "PRAGMA synchronous=NORMAL",
+    "PRAGMA temp_store=MEMORY",
+    "PRAGMA mmap_size=268435456",
+)
+
+
+def _set_sqlite_pragmas(dbapi_connection, connection_record) -> None:
+    """
+    Engine "connect" listener applying `_SQLITE_PRAGMAS` to a new
+    DB-API connection.
+    """
+    cursor = dbapi_connection.cursor()
+    try:
+        for pragma in _SQLITE_PRAGMAS:
+            cursor.execute(pragma)
+    finally:
+        cursor.close()
+
+
+# Attributes that users can be looked up and updated by
+_USER_COLUMNS = frozenset(column.name for column in User.__table__.columns)
+
 
 class DB:
     """
@@ -25,12 +83,15 @@ class DB:
     def __new__(cls):
         """
         Singleton pattern to ensure only one instance of DB exists.
-        Thread-safe instance creation.
+        Thread-safe instance creation, using double-checked locking so
+        the lock is only taken until the instance exists.
         """
-        with cls._lock:
-            if not cls._instance:
-                cls._instance = super().__new__(cls)
-                cls._instance.__initialize("sqlite:///a.db")
+        if cls._instance is None:
+            with cls._lock:
+                if cls._instance is None:
+                    instance = super().__new__(cls)
+                    instance.__initialize("sqlite:///a.db")
+                    cls._instance = instance
 
         return cls._instance
 
@@ -39,38 +100,127 @@ class DB:
         Initialize the database connection, create the engine with pooling,
         and set up the session factory.
         """
-        # Create the engine
-        self._engine = create_engine(uri)
+        # Create the engine. SQLAlchemy 1.3 opens a new SQLite connection
+        # per checkout by default; keep a pool of them instead and hand
+        # out the most recently used one first.
+        self._engine = create_engine(
+            uri,
+            poolclass=QueuePool,
+            pool_size=20,
+            max_overflow=30,
+            pool_use_lifo=True,
+            # Writers wait up to 30s for SQLite's write lock, not 5s
+            connect_args={"check_same_thread": False, "timeout": 30}
+        )
+        event.listen(self._engine, "connect", _set_sqlite_pragmas)
 
         # Create tables if not exists
         self._initialize_db()
 
-        # Create a sessionmaker factory
-        self.__session_factory = sessionmaker(bind=self._engine)
+        # Create a sessionmaker factory. Objects keep their loaded state
+        # after commit, so they stay usable once their session is removed.
+        self.__session_factory = sessionmaker(
+            bind=self._engine, expire_on_commit=False
+        )
+
+        # Using scoped_session to ensure thread-local session management;
+        # the thread's session lives until `teardown` removes it
+        self._Session = scoped_session(self.__session_factory)
 
     def _initialize_db(self) -> None:
         """
-        Initialize the database schema (tables) by creating them.
+        Initialize the database schema (tables) by creating the ones
+        that do not exist yet. Existing tables and data are kept, unless
+        the users table predates the current schema (see
+        `_has_current_users_schema`), in which case it is recreated.
         """
-        Base.metadata.drop_all(self._engine)
-        Base.metadata.create_all(self._engine)
+        if not self._has_current_users_schema():
+            User.__table__.drop(self._engine, checkfirst=True)
 
-    @property
-    def _session(self) -> scoped_session:
+        Base.metadata.create_all(self._engine, checkfirst=True)
+
+    def _has_current_users_schema(self) -> bool:
         """
-        Returns a session object. It ensures each thread gets
-        a separate session.
+        Tells whether the users table is missing or already has the
+        indexes of the current model, including the unique one on email.
+
+        Older tables lack them: they allow duplicate and mixed-case
+        emails, which the lookups no longer handle. There are no
+        migrations, so such a table is replaced as it was on every start
+        before existing data began to be kept.
+
+        Returns:
+            bool: False if an outdated users table exists, True otherwise.
+        """
+        inspector = inspect(self._engine)
+        if User.__tablename__ not in inspector.get_table_names():
+            return True
+
+        expected = {
+            index.name: bool(index.unique)
+            for index in User.__table__.indexes
+        }
+        existing = {
+            index["name"]: bool(index["unique"])
+            for index in inspector.get_indexes(User.__tablename__)
+        }
+        return expected.items() <= existing.items()
+
+    def teardown(self, error: Optional[BaseException] = None) -> None:
+        """
+        Ends the current thread's session: commits it, or rolls it back
+        if the work using it failed, then removes it from the registry so
+        the next unit of work starts with a fresh one.
+
+        Meant to run once per request, e.g. from Flask's
+        `teardown_appcontext`.
+
+        Args:
+            error (Optional[BaseException]): The exception that ended
+                the unit of work, if any.
+        """
+        session = self._Session()
+        try:
+            if error is None:
+                session.commit()
+            else:
+                session.rollback()
+        finally:
+            self._Session.remove()
+
+    @staticmethod
+    def _insert_user(
+            session: Session, email: str, hashed_password: bytes
+    ) -> User:
         """
-        # Using scoped_session to ensure thread-local session management
-        return scoped_session(self.__session_factory)
+        Inserts a user row with a Core INSERT, bypassing the ORM unit of
+        work, and builds the matching User from the generated id.
 
-    def add_user(self, email: str, hashed_password: str) -> User:
+        The returned User is detached, with every column loaded, as if it
+        had been read and its session closed. The caller commits.
+        """
+        result = session.execute(
+            User.__table__.insert().values(
+                email=email, hashed_password=hashed_password
+            )
+        )
+        user = User(
+            id=result.inserted_primary_key[0],
+            email=email,
+            hashed_password=hashed_password,
+            session_id=None,
+            reset_token=None
+        )
+        make_transient_to_detached(user)
+        return user
+
+    def add_user(self, email: str, hashed_password: bytes) -> User:
         """
         Adds a new user to the database and commits the transaction.
 
         Args:
             email (str): The user's email address.
-            hashed_password (str): The user's hashed password.
+            hashed_password (bytes): The user's bcrypt hash.
 
         Returns:
             Optional[User]: The created User object,
@@ -80,17 +230,50 @@ class DB:
            SQLAlchemyError: If an error occurs while interacting
             with the database.
         """
-        session = self._session()  # Get a session instance per thread
+        session = self._Session()
 
         try:
-            user = User(email=email, hashed_password=hashed_password)
-            session.add(user)
+            user = self._insert_user(session, email, hashed_password)
             session.commit()
         except SQLAlchemyError as err:
             session.rollback()
             raise SQLAlchemyError(err)
-        finally:
-            self._session.close()
+
+        return user
+
+    def add_user_if_absent(
+            self, email: str, hashed_password: bytes
+    ) -> Optional[User]:
+        """
+        Adds a new user unless one with the same email already exists.
+
+        The uniqueness check is left to the database's unique constraint
+        on email, so this is a single INSERT with no prior SELECT and no
+        race between concurrent registrations of the same email.
+
+        Args:
+            email (str): The user's email address.
+            hashed_password (bytes): The user's bcrypt hash.
+
+        Returns:
+            Optional[User]: The created User object,
+                or None if the email is already registered.
+
+        Raises:
+           SQLAlchemyError: If any other error occurs while interacting
+            with the database.
+        """
+        session = self._Session()
+
+        try:
+            user = self._insert_user(session, email, hashed_password)
+            session.commit()
+        except IntegrityError:
+            session.rollback()
+            return None
+        except SQLAlchemyError as err:
+            session.rollback()
+            raise SQLAlchemyError(err)
 
         return user
 
@@ -105,7 +288,7 @@ class DB:
            SQLAlchemyError: If an error occurs while interacting
             with the database.
         """
-        session = self._session()
+        session = self._Session()
 
         try:
             user = session.query(User).filter_by(email=email).one()
@@ -116,13 +299,15 @@ class DB:
         except SQLAlchemyError as err:
             session.rollback()
             raise SQLAlchemyError(err)
-        finally:
-            self._session.close()
 
     def find_user_by(self, **kwargs) -> User:
         """
         Find a user in the database based on keyword arguments.
 
+        Lookups on known columns with non-null values use a precompiled
+        query cached per set of keys; anything else, including IS NULL
+        matches, is built with filter_by.
+
         Args:
             **kwargs: Arbitrary keyword arguments for filtering.
 
@@ -133,27 +318,59 @@ class DB:
             NoResultFound: If no matching user is found.
             InvalidRequestError: If the query arguments are invalid.
         """
-        session = self._session()  # Get a session instance per thread
+        session = self._Session()
+
+        precompiled = (
+            kwargs
+            and kwargs.keys() <= _USER_COLUMNS
+            and None not in kwargs.values()
+        )
 
         try:
-            user = session.query(User).filter_by(**kwargs).one()
+            if precompiled:
+                query = _user_query_for(tuple(sorted(kwargs)))
+                user = query(session).params(**kwargs).one()
+            else:
+                user = session.query(User).filter_by(**kwargs).one()
         except NoResultFound:
             raise NoResultFound("No user found matching the criteria.")
         except InvalidRequestError:
             raise InvalidRequestError("Invalid query arguments provided.")
-        finally:
-            self._session.close()
+
+        return user
+
+    def find_user_by_email(self, email: str) -> User:
+        """
+        Find a user by email using a precompiled query.
+
+        Args:
+            email (str): The user's email address.
+
+        Returns:
+            User: The matching user object.
+
+        Raises:
+            NoResultFound: If no matching user is found.
+        """
+        session = self._Session()
+
+        try:
+            user = _user_query_for(("email",))(session).\
+                params(email=email).one()
+        except NoResultFound:
+            raise NoResultFound("No user found matching the criteria.")
 
         return user
 
     def update_user(self, user_id: int, **kwargs) -> None:
         """
         Updates an existing user in the database based on the provided user_id
-        and the given keyword arguments. The method finds the user by
-        the provided user_id, and updates the user's attributes with the
-        values provided in **kwargs. If an invalid attribute is provided in
-        **kwargs, a ValueError is raised. The changes are committed to the
-        database, and any errors during the update result in a rollback.
+        and the given keyword arguments. The method updates the user's
+        attributes with the values provided in **kwargs in a single UPDATE
+        statement, without loading the user first. If an invalid attribute
+        is provided in **kwargs, a ValueError is raised. The changes are
+        committed to the database, and any errors during the update result
+        in a rollback.
 
         Args:
             user_id (int): The ID of the user to update.
@@ -161,31 +378,107 @@ class DB:
                 representing the attributes to update.
 
         Raises:
-            ValueError: If an invalid attribute is provided in **kwargs.
-            InvalidRequestError: If there is an issue with the update request.
+            ValueError: If an invalid attribute is provided in **kwargs,
+                or if there is an issue with the update request.
+            NoResultFound: If no user has the given user_id.
 
         Returns:
             None: The method does not return any value.
         """
-        session = self._session()
+        invalid = kwargs.keys() - _USER_COLUMNS
+        if invalid:
+            raise ValueError(f"Invalid user attributes: {sorted(invalid)}")
 
-        user = self.find_user_by(id=user_id)
-        if not user:
-            return
+        session = self._Session()
 
         try:
-            session.query(User).filter_by(id=user_id).\
-                update(kwargs, synchronize_session=False)
+            count = session.query(User).filter(User.id == user_id).\
+                update(kwargs, synchronize_session="evaluate")
             session.commit()
         except InvalidRequestError as err:
             session.rollback()
             raise ValueError(err)
-        finally:
-            self._session.close()
+
+        if not count:
+            raise NoResultFound("No user found matching the criteria.")
+
+    def set_session_for_email(
+            self, email: str, session_id: Optional[str]
+    ) -> bool:
+        """
+        Sets the session ID of the user with the given email in a single
+        UPDATE, without loading the user first.
+
+        Args:
+            email (str): The user's email address.
+            session_id (Optional[str]): The session ID to store.
+
+        Returns:
+            bool: True if a user was updated, False if none matched.
+
+        Raises:
+           SQLAlchemyError: If an error occurs while interacting
+            with the database.
+        """
+        session = self._Session()
+
+        try:
+            count = session.query(User).filter(User.email == email).\
+                update(
+                    {"session_id": session_id},
+                    synchronize_session="evaluate"
+                )
+            session.commit()
+        except SQLAlchemyError as err:
+            session.rollback()
+            raise SQLAlchemyError(err)
+
+        return count > 0
+
+    def consume_reset_token(
+            self, reset_token: str, hashed_password: bytes
+    ) -> bool:
+        """
+        Sets a new password for the user holding the given reset token and
+        clears the token, in a single UPDATE. A token can therefore only
+        be used once, even by concurrent requests.
+
+        Args:
+            reset_token (str): The password reset token.
+            hashed_password (bytes): The new hashed password.
+
+        Returns:
+            bool: True if the token matched a user, False otherwise,
+                including when no token is given.
+
+        Raises:
+           SQLAlchemyError: If an error occurs while interacting
+            with the database.
+        """
+        # `reset_token == None` would compile to IS NULL and match every
+        # user without a pending reset
+        if not reset_token:
+            return False
+
+        session = self._Session()
+
+        try:
+            count = session.query(User).\
+                filter(User.reset_token == reset_token).\
+                update(
+                    {"hashed_password": hashed_password, "reset_token": None},
+                    synchronize_session="evaluate"
+                )
+            session.commit()
+        except SQLAlchemyError as err:
+            session.rollback()
+            raise SQLAlchemyError(err)
+
+        return count > 0
 
     def close(self) -> None:
         """
         Dispose the engine and clean up session management.
         """
-        self._session.remove()
+        self._Session.remove()
         self._engine.dispose()
@@ -8,7 +8,7 @@ It is mapped to the "users" table in the database
 and provides a structure for user authentication and session management.
 """
 
-from sqlalchemy import Column, String, Integer
+from sqlalchemy import Column, String, Integer, LargeBinary
 from sqlalchemy.ext.declarative import declarative_base
 
 Base = declarative_base()
@@ -21,12 +21,14 @@ class User(Base):
      This class defines the structure of the "users" table,
      including columns for the user's ID, email, hashed password,
      session ID, and password reset token. It is mapped to the "users"
-     table in the database using SQLAlchemy ORM.
+     table in the database using SQLAlchemy ORM. The email, session ID
+     and reset token columns are indexed, as users are looked up by them.
 
      Attributes:
          id (int): The unique identifier for the user (primary key).
-         email (str): The user's email address, which cannot be null.
-         hashed_password (str): The user's hashed password,
+         email (str): The user's email address, which must be unique and
+            cannot be null.
+         hashed_password (bytes): The user's raw 60-byte bcrypt hash,
             which cannot be null.
          session_id (str, optional): A session ID for the user, can be null.
          reset_token (str, optional): A token for resetting the
@@ -35,7 +37,7 @@ class User(Base):
     __tablename__ = "users"
 
     id = Column(Integer, primary_key=True)
-    email = Column(String(250), nullable=False)
-    hashed_password = Column(String(250), nullable=False)
-    session_id = Column(String(250), nullable=True)
-    reset_token = Column(String(250), nullable=True)
+    email = Column(String(250), nullable=False, unique=True, index=True)
+    hashed_password = Column(LargeBinary(60), nullable=False)
+    session_id = Column(String(250), nullable=True, index=True)
+    reset_token = Column(String(250), nullable=True, index=True)